@@ -44,11 +44,16 @@ where <command> is one of:
         Compile the ".po" catalogue files to ".mo" and ".js" files.
 """
 
+import functools
 import json
 import logging
 import os
+import pickle
+import re
 import sys
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
 
 from babel.messages.catalog import Catalog
 from babel.messages.extract import (
@@ -59,7 +64,6 @@ from babel.messages.extract import (
 )
 from babel.messages.mofile import write_mo
 from babel.messages.pofile import read_po, write_po
-from babel.util import pathmatch
 from jinja2.ext import babel_extract as extract_jinja2
 
 TEX_DELIMITERS = {
@@ -68,19 +72,26 @@ TEX_DELIMITERS = {
     'block_start_string': '<%',
     'block_end_string': '%>',
 }
+# Extraction methods are referred to by name so that work items stay
+# cheap to pickle when sent to worker processes.
+EXTRACTORS = {
+    'python': extract_python,
+    'jinja2': extract_jinja2,
+    'js': extract_javascript,
+}
 METHOD_MAP = [
     # Extraction from Python source files
-    ('**.py', extract_python),
+    ('**.py', 'python'),
     # Extraction from Jinja2 template files
-    ('**/templates/latex/**.tex_t', extract_jinja2),
-    ('**/templates/latex/**.sty_t', extract_jinja2),
+    ('**/templates/latex/**.tex_t', 'jinja2'),
+    ('**/templates/latex/**.sty_t', 'jinja2'),
     # Extraction from Jinja2 HTML templates
-    ('**/themes/**.html', extract_jinja2),
+    ('**/themes/**.html', 'jinja2'),
     # Extraction from Jinja2 XML templates
-    ('**/themes/**.xml', extract_jinja2),
+    ('**/themes/**.xml', 'jinja2'),
     # Extraction from JavaScript files
-    ('**.js', extract_javascript),
-    ('**.js_t', extract_javascript),
+    ('**.js', 'js'),
+    ('**.js_t', 'js'),
 ]
 OPTIONS_MAP = {
     # Extraction from Python source files
@@ -98,6 +109,136 @@ OPTIONS_MAP = {
     },
 }
 KEYWORDS = {**DEFAULT_KEYWORDS, '_': None, '__': None}
+# Messages whose locations end with these suffixes go into the .js
+# translation file.
+_JS_SUFFIXES = ('.js', '.js.jinja', '.js_t', '.html')
+# Babel's writers emit many small writes per message and its reader
+# consumes PO files line by line; a large buffer keeps the syscall
+# count low on big catalogs.
+BUFFER_SIZE = 512 * 1024
+
+def _atomic_write(path: str, write_fn, mode: str = 'wb', **open_kwargs):
+    """Write a file via a temporary file and an atomic `os.replace`.
+
+    `write_fn` is called with the open temporary file; readers never
+    observe a half-written file, and a crash leaves the old file intact.
+    """
+    tmp_name = os.path.join(
+        os.path.dirname(path), tempfile.gettempprefix() + os.path.basename(path),
+    )
+    try:
+        with open(
+            tmp_name, mode, buffering=BUFFER_SIZE, **open_kwargs
+        ) as tmpfile:
+            write_fn(tmpfile)
+    except Exception:
+        os.remove(tmp_name)
+        raise
+    os.replace(tmp_name, path)
+
+def _translate_pathmatch(pattern: str) -> "re.Pattern[str]":
+    """Compile a glob pattern the same way `babel.util.pathmatch` does.
+
+    `pathmatch` re-translates the glob and recompiles the regex on every
+    call; compiling each pattern once at import time lets the walk in
+    `run_extract` reuse them for every file.
+    """
+    symbols = {
+        '?': '[^/]',
+        '?/': '[^/]/',
+        '*': '[^/]+',
+        '*/': '[^/]+/',
+        '**/': '(?:.+/)*?',
+        '**': '(?:.+/)*?[^/]+',
+    }
+
+    if pattern.startswith('^'):
+        buf = ['^']
+        pattern = pattern[1:]
+    elif pattern.startswith('./'):
+        buf = ['^']
+        pattern = pattern[2:]
+    else:
+        buf = []
+
+    for idx, part in enumerate(re.split('([?*]+/?)', pattern)):
+        if idx % 2:
+            buf.append(symbols[part])
+        elif part:
+            buf.append(re.escape(part))
+    return re.compile(f"{''.join(buf)}$")
+
+def _is_suffix_pattern(pattern: str) -> bool:
+    """Whether a glob of the form ``**.ext`` is a plain suffix check."""
+    return (pattern.startswith('**.')
+            and not any(c in pattern[2:] for c in '*?/'))
+
+# Most patterns are plain ``**.ext`` globs; dispatching those through a
+# dict keyed by extension avoids running any regex at all for the
+# common case. Only the remaining patterns fall back to regexes.
+_SUFFIX_METHODS = {
+    pattern[2:]: method
+    for pattern, method in METHOD_MAP if _is_suffix_pattern(pattern)
+}
+_METHOD_MAP_RE = [
+    (_translate_pathmatch(pattern), method)
+    for pattern, method in METHOD_MAP if not _is_suffix_pattern(pattern)
+]
+_SUFFIX_OPTIONS = {
+    pattern[2:]: opt_dict
+    for pattern, opt_dict in OPTIONS_MAP.items() if _is_suffix_pattern(pattern)
+}
+_OPTIONS_MAP_RE = [
+    (_translate_pathmatch(pattern), opt_dict)
+    for pattern, opt_dict in OPTIONS_MAP.items()
+    if not _is_suffix_pattern(pattern)
+]
+
+def _walk_sorted(base: str):
+    """Yield the files under `base` recursively, sorted by name.
+
+    A recursive `os.scandir` replaces `os.walk` here: it sorts each
+    directory once (instead of sorting dirnames and filenames
+    separately) and the yielded `DirEntry` objects carry cached stat
+    information for the caller.
+    """
+    with os.scandir(base) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_sorted(entry.path)
+            else:
+                yield entry
+
+
+def _extract_file(task: tuple) -> tuple:
+    """Extract messages from a single file (run in a worker process).
+
+    Takes a ``(full_path, relative_name, method, options)`` tuple where
+    ``method`` is a key of `EXTRACTORS`, and returns the relative name
+    along with the extracted message tuples.
+    """
+    full_path, relative_name, method, options = task
+    with open(full_path, 'rb') as fileobj:
+        results = list(extract(
+            EXTRACTORS[method], fileobj, KEYWORDS, options=options,
+        ))
+    return relative_name, results
+
+
+def _add_results(
+    catalogue: Catalog, src_path: str, relative_name: str, results: list
+) -> None:
+    """Merge the message tuples extracted from one file into the catalogue."""
+    filepath = os.path.join(src_path, relative_name)
+    for lineno, message, comments, context in results:
+        if isinstance(message, list):
+            # Plural messages come back from the JSON cache as lists
+            message = tuple(message)
+        catalogue.add(
+            message, None, [(filepath, lineno)],
+            auto_comments=comments, context=context,
+        )
+
 
 def run_extract(name: str, src_path: str) -> None:
     """Message extraction function."""
@@ -108,75 +249,233 @@ def run_extract(name: str, src_path: str) -> None:
         copyright_holder="CBerJun"
     )
 
+    # Results of the previous extraction, keyed by relative file name.
+    # Files whose mtime is unchanged are replayed from here instead of
+    # being re-parsed.
+    cache_file = os.path.join(src_path, 'locales', '.extract_cache.json')
+    try:
+        with open(cache_file, encoding='utf-8') as infile:
+            cache = json.load(infile)
+    except (OSError, ValueError):
+        cache = {}
+    new_cache = {}
+
+    # Collect the work list first...
+    tasks = []
+    mtimes = {}
+    # Message lists for every file in walk order. Cache hits are
+    # filled in right away and re-extracted files after the pool below
+    # finishes, so the catalogue (and hence the .pot and the updated
+    # .po files) keep the same deterministic order on every run.
+    ordered = []
     base = os.path.abspath(src_path)
-    for root, dirnames, filenames in os.walk(base):
-        relative_root = os.path.relpath(root, base) if root != base else ''
-        dirnames.sort()
-        for filename in sorted(filenames):
-            relative_name = os.path.join(relative_root, filename)
-            for pattern, method in METHOD_MAP:
-                if not pathmatch(pattern, relative_name):
-                    continue
-
-                options = {}
-                for opt_pattern, opt_dict in OPTIONS_MAP.items():
-                    if pathmatch(opt_pattern, relative_name):
-                        options = opt_dict
-                with open(os.path.join(root, filename), 'rb') as fileobj:
-                    for lineno, message, comments, context in extract(
-                        method, fileobj, KEYWORDS, options=options,
-                    ):
-                        filepath = os.path.join(src_path, relative_name)
-                        catalogue.add(
-                            message, None, [(filepath, lineno)],
-                            auto_comments=comments, context=context,
-                        )
-                break
+    for entry in _walk_sorted(base):
+        relative_name = os.path.relpath(entry.path, base)
+        posix_name = relative_name.replace(os.sep, '/')
+        ext = os.path.splitext(entry.name)[1]
+        method = _SUFFIX_METHODS.get(ext)
+        if method is None:
+            for pattern, pat_method in _METHOD_MAP_RE:
+                if pattern.match(posix_name):
+                    method = pat_method
+                    break
+            else:
+                continue
+
+        mtime_ns = entry.stat().st_mtime_ns
+        cached = cache.get(relative_name)
+        if cached is not None and cached['mtime'] == mtime_ns:
+            new_cache[relative_name] = cached
+            ordered.append((relative_name, cached['msgs']))
+            continue
+
+        options = _SUFFIX_OPTIONS.get(ext, {})
+        for opt_pattern, opt_dict in _OPTIONS_MAP_RE:
+            if opt_pattern.match(posix_name):
+                options = opt_dict
+        mtimes[relative_name] = mtime_ns
+        ordered.append((relative_name, None))
+        tasks.append((entry.path, relative_name, method, options))
+
+    # ... then fan out the CPU-bound extraction and merge everything
+    # into the single catalogue on the main process, in walk order.
+    extracted = {}
+    if tasks:
+        with ProcessPoolExecutor(
+            max_workers=min(os.cpu_count(), len(tasks))
+        ) as executor:
+            for relative_name, results in executor.map(
+                _extract_file, tasks, chunksize=8,
+            ):
+                new_cache[relative_name] = {
+                    'mtime': mtimes[relative_name],
+                    'msgs': results,
+                }
+                extracted[relative_name] = results
+
+    for relative_name, results in ordered:
+        if results is None:
+            results = extracted[relative_name]
+        _add_results(catalogue, src_path, relative_name, results)
 
     output_file = os.path.join(src_path, 'locales', f'{name}.pot')
     log.info('writing PO template file to %s', output_file)
-    with open(output_file, 'wb') as outfile:
-        write_po(outfile, catalogue)
+    _atomic_write(output_file, lambda f: write_po(f, catalogue))
 
+    _atomic_write(
+        cache_file, lambda f: json.dump(new_cache, f),
+        mode='w', encoding='utf-8',
+    )
 
-def run_update(name: str, src_path: str, init=False):
-    """Catalog merging command."""
 
+def _list_locales(locale_dir: str) -> list:
+    """List the locale subdirectories of a "locales" directory.
+
+    `os.scandir` caches the stat result on each entry, so this takes one
+    syscall per entry instead of the listdir + isdir pair.
+    """
+    with os.scandir(locale_dir) as entries:
+        return sorted(
+            entry.name for entry in entries
+            if entry.is_dir(follow_symlinks=False)
+        )
+
+
+def _load_template(name: str, locale_dir: str) -> bytes:
+    """Parse the .pot template once and pickle it for the workers."""
+    template_file = os.path.join(locale_dir, f'{name}.pot')
+    with open(template_file, 'rb', buffering=BUFFER_SIZE) as infile:
+        template = read_po(infile)
+    return pickle.dumps(template, protocol=5)
+
+
+def _update_one(
+    name: str, locale_dir: str, locale: str, init: bool,
+    template_bytes: bytes,
+) -> None:
+    """Update the catalog of a single locale (run in a worker process).
+
+    `template_bytes` is the pickled template catalog; unpickling it is
+    much cheaper than having every worker re-run the PO parser.
+    """
     log = _get_logger()
 
-    locale_dir = os.path.join(src_path, 'locales')
     template_file = os.path.join(locale_dir, f'{name}.pot')
+    subdir = os.path.join(locale_dir, locale)
+    filename = os.path.join(subdir, 'LC_MESSAGES', f'{name}.po')
+    if not os.path.exists(filename):
+        if init and os.path.isdir(subdir):
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            Path(filename).touch()
+        else:
+            return
 
-    with open(template_file, encoding='utf-8') as infile:
-        template = read_po(infile)
+    template = pickle.loads(template_bytes)
 
-    for locale in os.listdir(locale_dir):
-        subdir = os.path.join(locale_dir, locale)
-        filename = os.path.join(subdir, 'LC_MESSAGES', f'{name}.po')
-        if not os.path.exists(filename):
-            if init and os.path.isdir(subdir):
-                os.makedirs(os.path.dirname(filename), exist_ok=True)
-                with open(filename, 'w'):
-                    pass
-            else:
-                continue
+    log.info('updating catalog %s based on %s', filename, template_file)
+    with open(filename, 'rb', buffering=BUFFER_SIZE) as infile:
+        catalog = read_po(infile, locale=locale, domain=name)
 
-        log.info('updating catalog %s based on %s', filename, template_file)
-        with open(filename, encoding='utf-8') as infile:
-            catalog = read_po(infile, locale=locale, domain=name)
+    catalog.update(template)
+    _atomic_write(filename, lambda f: write_po(f, catalog))
 
-        catalog.update(template)
-        tmp_name = os.path.join(
-            os.path.dirname(filename), tempfile.gettempprefix() + os.path.basename(filename),
-        )
-        try:
-            with open(tmp_name, 'wb') as tmpfile:
-                write_po(tmpfile, catalog)
-        except Exception:
-            os.remove(tmp_name)
-            raise
 
-        os.replace(tmp_name, filename)
+def run_update(name: str, src_path: str, init=False):
+    """Catalog merging command."""
+
+    locale_dir = os.path.join(src_path, 'locales')
+    locales = _list_locales(locale_dir)
+    if not locales:
+        return
+
+    template_bytes = _load_template(name, locale_dir)
+
+    with ProcessPoolExecutor(
+        max_workers=min(os.cpu_count(), len(locales))
+    ) as executor:
+        # Consume the iterator so worker exceptions propagate.
+        for _result in executor.map(
+            _update_one, [name] * len(locales), [locale_dir] * len(locales),
+            locales, [init] * len(locales),
+            [template_bytes] * len(locales),
+        ):
+            pass
+
+
+def _compile_one(name: str, directory: str, locale: str) -> int:
+    """Compile the catalog of a single locale (run in a worker process).
+
+    Returns the number of errors encountered.
+    """
+    log = _get_logger()
+
+    po_file = os.path.join(directory, locale, 'LC_MESSAGES', f'{name}.po')
+    if not os.path.exists(po_file):
+        return 0
+
+    mo_file = os.path.join(directory, locale, 'LC_MESSAGES', f'{name}.mo')
+    js_file = os.path.join(directory, locale, 'LC_MESSAGES', f'{name}.js')
+
+    # Skip locales whose outputs are already up to date
+    po_mtime = os.stat(po_file).st_mtime
+    try:
+        if (os.stat(mo_file).st_mtime >= po_mtime
+                and os.stat(js_file).st_mtime >= po_mtime):
+            log.info('catalog %s is up to date, skipping', po_file)
+            return 0
+    except OSError:
+        pass
+
+    with open(po_file, 'rb', buffering=BUFFER_SIZE) as infile:
+        catalog = read_po(infile, locale)
+
+    # The source msgids are identical across locale catalogs; intern
+    # them so catalogs loaded in the same process share one copy.
+    for message in catalog:
+        if isinstance(message.id, str):
+            message.id = sys.intern(message.id)
+        else:
+            message.id = tuple(sys.intern(s) for s in message.id)
+
+    if catalog.fuzzy:
+        log.info('catalog %s is marked as fuzzy, skipping', po_file)
+        return 0
+
+    errors_found = 0
+    for message, errors in catalog.check():
+        for error in errors:
+            errors_found += 1
+            log.error('error: %s:%d: %s\nerror:     in message string: %s',
+                      po_file, message.lineno, error, message.string)
+
+    log.info('compiling catalog %s to %s', po_file, mo_file)
+    _atomic_write(mo_file, lambda f: write_mo(f, catalog, use_fuzzy=False))
+
+    log.info('writing JavaScript strings in catalog %s to %s', po_file, js_file)
+    plural_expr = catalog.plural_expr
+    js_catalogue = {
+        (m.id[0] if isinstance(m.id, (list, tuple)) else m.id): m.string
+        for m in catalog
+        if any(loc[0].endswith(_JS_SUFFIXES) for loc in m.locations)
+    }
+
+    def write_js(outfile):
+        outfile.write('Documentation.addTranslations(')
+        # Stream the JSON into the file directly rather than
+        # materializing it as one big string first. The file is
+        # machine-read, so skip pretty-printing; sort_keys keeps the
+        # output deterministic.
+        json.dump({
+            'messages': js_catalogue,
+            'plural_expr': plural_expr,
+            'locale': str(catalog.locale),
+        }, outfile, sort_keys=True, separators=(',', ':'))
+        outfile.write(');')
+
+    # newline='\n' ensures lines end with ``\n`` rather than ``\r\n``
+    _atomic_write(js_file, write_js, mode='w', encoding='utf-8', newline='\n')
+
+    return errors_found
 
 
 def run_compile(name: str, src_path: str):
@@ -193,52 +492,59 @@ def run_compile(name: str, src_path: str):
     log = _get_logger()
 
     directory = os.path.join(src_path, 'locales')
-    total_errors = 0
+    locales = _list_locales(directory)
+    if not locales:
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=min(os.cpu_count(), len(locales))
+    ) as executor:
+        total_errors = sum(executor.map(
+            _compile_one, [name] * len(locales), [directory] * len(locales),
+            locales,
+        ))
 
-    for locale in os.listdir(directory):
-        po_file = os.path.join(directory, locale, 'LC_MESSAGES', f'{name}.po')
-        if not os.path.exists(po_file):
-            continue
+    if total_errors > 0:
+        log.error('%d errors encountered.', total_errors)
+        print("Compiling failed.", file=sys.stderr)
+        sys.exit(2)
 
-        with open(po_file, encoding='utf-8') as infile:
-            catalog = read_po(infile, locale)
 
-        if catalog.fuzzy:
-            log.info('catalog %s is marked as fuzzy, skipping', po_file)
-            continue
+def run_all(name: str, src_path: str):
+    """Run extract, update and compile with update/compile pipelined.
 
-        for message, errors in catalog.check():
-            for error in errors:
-                total_errors += 1
-                log.error('error: %s:%d: %s\nerror:     in message string: %s',
-                          po_file, message.lineno, error, message.string)
-
-        mo_file = os.path.join(directory, locale, 'LC_MESSAGES', f'{name}.mo')
-        log.info('compiling catalog %s to %s', po_file, mo_file)
-        with open(mo_file, 'wb') as outfile:
-            write_mo(outfile, catalog, use_fuzzy=False)
-
-        js_file = os.path.join(directory, locale, 'LC_MESSAGES', f'{name}.js')
-        log.info('writing JavaScript strings in catalog %s to %s', po_file, js_file)
-        js_catalogue = {}
-        for message in catalog:
-            if any(
-                    x[0].endswith(('.js', '.js.jinja', '.js_t', '.html'))
-                    for x in message.locations
-            ):
-                msgid = message.id
-                if isinstance(msgid, (list, tuple)):
-                    msgid = msgid[0]
-                js_catalogue[msgid] = message.string
+    Extraction is a barrier (the template must be complete before any
+    catalog is merged), but each locale can be compiled as soon as its
+    own update finishes, so the two stages overlap per locale instead of
+    running back to back.
+    """
+    log = _get_logger()
 
-        obj = json.dumps({
-            'messages': js_catalogue,
-            'plural_expr': catalog.plural_expr,
-            'locale': str(catalog.locale),
-        }, sort_keys=True, indent=4)
-        with open(js_file, 'wb') as outfile:
-            # to ensure lines end with ``\n`` rather than ``\r\n``:
-            outfile.write(f'Documentation.addTranslations({obj});'.encode())
+    run_extract(name, src_path)
+
+    locale_dir = os.path.join(src_path, 'locales')
+    locales = _list_locales(locale_dir)
+    if not locales:
+        return
+
+    template_bytes = _load_template(name, locale_dir)
+
+    with ProcessPoolExecutor(
+        max_workers=min(os.cpu_count(), len(locales))
+    ) as executor:
+        update_futures = {
+            executor.submit(
+                _update_one, name, locale_dir, locale, False, template_bytes,
+            ): locale
+            for locale in locales
+        }
+        compile_futures = []
+        for future in as_completed(update_futures):
+            future.result()
+            compile_futures.append(executor.submit(
+                _compile_one, name, locale_dir, update_futures[future],
+            ))
+        total_errors = sum(future.result() for future in compile_futures)
 
     if total_errors > 0:
         log.error('%d errors encountered.', total_errors)
@@ -246,6 +552,7 @@ def run_compile(name: str, src_path: str):
         sys.exit(2)
 
 
+@functools.lru_cache(maxsize=1)
 def _get_logger():
     log = logging.getLogger('babel')
     log.setLevel(logging.INFO)
@@ -273,13 +580,7 @@ def main():
     if action == "compile":
         sys.exit(run_compile(catalog_name, src_dir))
     if action == "all":
-        exit_code = run_extract(catalog_name, src_dir)
-        if exit_code:
-            sys.exit(exit_code)
-        exit_code = run_update(catalog_name, src_dir)
-        if exit_code:
-            sys.exit(exit_code)
-        sys.exit(run_compile(catalog_name, src_dir))
+        sys.exit(run_all(catalog_name, src_dir))
 
 if __name__ == '__main__':
     main()
@@ -1,7 +1,13 @@
+import functools
 import os
+import re
+import sys
 from typing import (
-    TYPE_CHECKING, Any, cast, Iterator, NamedTuple, TypeVar, TypeAlias
+    TYPE_CHECKING, Any, cast, Iterator, NamedTuple, TypeVar
 )
+from collections import Counter
+from array import array
+from dataclasses import dataclass
 from enum import Enum
 from sphinx.domains import Domain, ObjType
 from sphinx.directives import ObjectDescription
@@ -31,24 +37,108 @@ BASES = {
     'B': 2,
     'O': 8,
 }
-OPS = '+-*/%=&.,><:'
-TWOCHAR_OPS = ('->', '**', '>=', '<=', '==', '!=')
-EXPRESSION_OPS = (
+# frozensets: membership is a hash probe instead of a linear scan
+OPS = frozenset('+-*/%=&.,><:')
+# Two-char ops are '->', '**', '>=', '<=', '==' and '!='; the
+# tokenizer recognizes them by direct character tests.
+EXPRESSION_OPS = frozenset((
     '+', '-', '*', '/', '%', '.', '>', '<',
     '>=', '<=', '==', '!='
-)
+))
 BRACKETS = {
     '(': ')',
     '[': ']',
     '{': '}',
 }
-CLOSE_BRACKETS = tuple(BRACKETS.values())
+CLOSE_BRACKETS = frozenset(BRACKETS.values())
+
+# Character classes for the signature tokenizer. Classifying a
+# character is one table index instead of a cascade of membership tests
+# and method calls.
+CC_OTHER = 0
+CC_SPACE = 1
+CC_DIGIT = 2
+CC_NAME = 3
+CC_OP = 4
+CC_LPAREN = 5
+CC_RPAREN = 6
+CC_QUOTE = 7
+
+def _build_char_class() -> bytes:
+    table = bytearray(256)
+    for code in range(256):
+        ch = chr(code)
+        if ch.isspace():
+            table[code] = CC_SPACE
+        elif ch in DECDIGITS:
+            table[code] = CC_DIGIT
+        elif ch.isalpha() or ch == '_':
+            table[code] = CC_NAME
+        elif ch in OPS or ch == '!':
+            # '!' is not a valid operator on its own but starts '!='
+            table[code] = CC_OP
+        elif ch in BRACKETS:
+            table[code] = CC_LPAREN
+        elif ch in CLOSE_BRACKETS:
+            table[code] = CC_RPAREN
+        elif ch == '"':
+            table[code] = CC_QUOTE
+    return bytes(table)
+
+CHAR_CLASS = _build_char_class()
+# Identifier continuation is exactly "name or digit", so the scanner
+# can test one byte per character instead of isalpha()/membership/'_'
+# checks. Non-Latin-1 letters fall back to str.isalpha.
+IDENT_CONT = bytes(
+    cls == CC_NAME or cls == CC_DIGIT for cls in CHAR_CLASS
+)
+# Token-body scanners. One C-level regex match consumes a whole run
+# where the per-character loop paid an interpreter round-trip per char;
+# the classes are spelled out in ASCII so the accepted characters stay
+# exactly the same as before.
+_RE_IDENT_BODY = re.compile(r'[A-Za-z0-9_]*')
+_RE_DEC_BODY = re.compile(r'[0-9]*(?:\.[0-9]*)?')
+_RE_BASE_BODY = {
+    16: re.compile(r'[0-9a-fA-F]*'),
+    2: re.compile(r'[01]*'),
+    8: re.compile(r'[0-7]*'),
+}
+
+def _scan_number(sig: str, i: int) -> int:
+    """Scan the numeric literal starting at `i`; return its end index."""
+    if (sig[i] == '0' and i + 1 < len(sig)
+            and (b := sig[i + 1].upper()) in BASES):
+        j = i + 3
+        if j < len(sig):
+            j = _RE_BASE_BODY[BASES[b]].match(sig, j).end()
+        return j
+    return _RE_DEC_BODY.match(sig, i + 1).end()
 
 _ = get_translation(I18N_CATALOG)
 logger = logging.getLogger(__name__)
 
+# signode / refnode attribute keys. These contain ':' so the compiler
+# does not intern them automatically; interning them once here lets
+# every repeated dict lookup below compare keys by identity.
+_K_CTX = sys.intern('aca:ctx')
+_K_PARTIAL_NAME = sys.intern('aca:partial_name')
+_K_FULL_NAME = sys.intern('aca:full_name')
+_K_MODULE_ATTR = sys.intern('aca:module_attr')
+_K_ATTR_OWNER_FULLNAME = sys.intern('aca:attr_owner_fullname')
+
 class MCWikiRole(ReferenceRole):
+    # Lazily cached translations; the catalog is not loaded yet at
+    # import time, but is constant for the rest of the build, so later
+    # invocations skip the per-call gettext lookups.
+    _url_prefix: str | None = None
+    _title_fmt: str | None = None
+
     def run(self) -> tuple[list["Node"], list["system_message"]]:
+        prefix = MCWikiRole._url_prefix
+        if prefix is None:
+            prefix = "https://%s.minecraft.wiki/w/" % _("www")
+            MCWikiRole._url_prefix = prefix
+            MCWikiRole._title_fmt = _("MCWiki: %s")
         target = self.target
         if self.has_explicit_title:
             title = self.title
@@ -57,22 +147,48 @@ class MCWikiRole(ReferenceRole):
                 target = self.target[1:]
                 title = target
             else:
-                title = _("MCWiki: %s") % target
-        refuri = "https://%s.minecraft.wiki/w/%s" % (_("www"), target)
-        reference = nodes.reference('', title, internal=False, refuri=refuri)
+                title = MCWikiRole._title_fmt % target
+        reference = nodes.reference('', title, internal=False,
+                                    refuri=prefix + target)
         return [reference], []
 
+class _AcaCtx:
+    """Per-document parsing state kept in ``env.ref_context``.
+
+    One slotted object with attribute access replaces the six string-
+    keyed ``ref_context`` entries the directives and roles used to
+    maintain; every read is an offset load instead of a dict probe.
+    """
+    __slots__ = (
+        'module', 'module_stack', 'attr_owner', 'attr_owner_stack',
+        'param_stack', 'param_union',
+    )
+
+    def __init__(self) -> None:
+        self.module: str | None = None
+        self.module_stack: list[str | None] = []
+        self.attr_owner: AttrOwner | None = None
+        self.attr_owner_stack: list[AttrOwner | None] = []
+        self.param_stack: list[frozenset[str]] = []
+        # Multiset union of every frame on `param_stack`, so that the
+        # param role can check scope with one hash lookup regardless of
+        # nesting depth.
+        self.param_union: Counter = Counter()
+
+def _get_ctx(env: "BuildEnvironment") -> _AcaCtx:
+    ctx = env.ref_context.get(_K_CTX)
+    if ctx is None:
+        ctx = env.ref_context[_K_CTX] = _AcaCtx()
+    return ctx
+
 def push_module(name: str, env: "BuildEnvironment") -> None:
-    modules: list[str | None] = env.ref_context.setdefault('aca:modules', [])
-    modules.append(env.ref_context.get('aca:module'))
-    env.ref_context['aca:module'] = name
+    ctx = _get_ctx(env)
+    ctx.module_stack.append(ctx.module)
+    ctx.module = name
 
 def pop_module(env: "BuildEnvironment") -> None:
-    modules: list[str | None] = env.ref_context['aca:modules']
-    env.ref_context['aca:module'] = modules.pop()
-
-def get_fullname(name: str, modname: str | None) -> str:
-    return (modname + '.' if modname else '') + name
+    ctx = _get_ctx(env)
+    ctx.module = ctx.module_stack.pop()
 
 T = TypeVar('T')
 
@@ -85,8 +201,6 @@ class AttrOwner(NamedTuple):
     fullname: str
     type: AttrOwning
 
-AttrOwnerStack: TypeAlias = list[AttrOwner | None]
-
 class BaseAcaciaObject(ObjectDescription[T]):
     option_spec: "OptionSpec" = {
         'no-index': directives.flag,
@@ -98,10 +212,8 @@ class BaseAcaciaObject(ObjectDescription[T]):
     attribute_owning: AttrOwning = AttrOwning.ALL_STATIC
 
     def full_name_from_partial(self, partial_name: str) -> str:
-        return get_fullname(
-            partial_name,
-            self.env.ref_context.get('aca:module')
-        )
+        modname = _get_ctx(self.env).module
+        return f'{modname}.{partial_name}' if modname else partial_name
 
     def partial_name_from_object(self, ob: T) -> str:
         raise NotImplementedError
@@ -117,39 +229,38 @@ class BaseAcaciaObject(ObjectDescription[T]):
 
     def handle_signature(self, sig: str, sig_node: "desc_signature") -> T:
         ob = self.my_handle_signature(sig, sig_node)
-        sig_node['aca:partial_name'] = partial_name = \
+        sig_node[_K_PARTIAL_NAME] = partial_name = \
             self.partial_name_from_object(ob)
-        sig_node['aca:full_name'] = self.full_name_from_partial(partial_name)
+        sig_node[_K_FULL_NAME] = self.full_name_from_partial(partial_name)
         return ob
 
     def before_content(self):
         if self.attribute_owning is AttrOwning.NO_ATTR:
             return
-        names: AttrOwnerStack = \
-            self.env.ref_context.setdefault('aca:attr_owners', [])
-        names.append(self.env.ref_context.get('aca:attr_owner'))
+        ctx = _get_ctx(self.env)
+        ctx.attr_owner_stack.append(ctx.attr_owner)
         fullname = self.full_name_from_partial(
             self.partial_name_from_object(self.names[0])
         )
-        self.env.ref_context['aca:attr_owner'] = \
-            AttrOwner(fullname, self.attribute_owning)
+        ctx.attr_owner = AttrOwner(fullname, self.attribute_owning)
 
     def after_content(self):
         if self.attribute_owning is AttrOwning.NO_ATTR:
             return
-        names: AttrOwnerStack = self.env.ref_context['aca:attr_owners']
-        self.env.ref_context['aca:attr_owner'] = names.pop()
+        ctx = _get_ctx(self.env)
+        ctx.attr_owner = ctx.attr_owner_stack.pop()
 
     def add_target_and_index(
         self, name: T, sig: str, signode: "desc_signature"
     ) -> None:
-        fullname = signode['aca:full_name']
-        node_id = make_id(self.env, self.state.document,
-                          self.objtype, fullname)
+        env = self.env
+        document = self.state.document
+        fullname = signode[_K_FULL_NAME]
+        node_id = make_id(env, document, self.objtype, fullname)
         signode['ids'].append(node_id)
-        self.state.document.note_explicit_target(signode)
+        document.note_explicit_target(signode)
 
-        domain = cast(AcaciaDomain, self.env.get_domain('aca'))
+        domain = cast(AcaciaDomain, env.get_domain('aca'))
         domain.note_object(self.objtype, fullname, node_id, location=signode)
 
         if 'no-index-entry' not in self.options:
@@ -161,11 +272,11 @@ class BaseAcaciaObject(ObjectDescription[T]):
     def _toc_entry_name(self, sig_node: "desc_signature") -> str:
         if not sig_node.get('_toc_parts'):
             return ''
-        return self.transform_content_name(sig_node['aca:partial_name'])
+        return self.transform_content_name(sig_node[_K_PARTIAL_NAME])
 
     def _object_hierarchy_parts(self, sig_node: "desc_signature") \
             -> tuple[str, ...]:
-        full_name: str = sig_node['aca:full_name']
+        full_name: str = sig_node[_K_FULL_NAME]
         return tuple(full_name.replace('::', '.').split('.'))
 
 class AcaciaObject(BaseAcaciaObject[str]):
@@ -177,267 +288,383 @@ def function_type(argument: str | None) -> str | None:
         return argument
     raise ValueError('invalid function type: %r' % argument)
 
-class Token(NamedTuple):
-    type: str
+# Integer type codes for tokens. The tokenizer emits a structure of
+# arrays (a byte of type code plus start/end offsets into the signature
+# per token) instead of a list of Token objects, and materialized
+# Tokens carry the same small-int tag, so all dispatch is integer
+# compares and table indexing.
+TT_OP = 0
+TT_LPAREN = 1
+TT_RPAREN = 2
+TT_NUMBER = 3
+TT_STRING = 4
+TT_KEYWORD = 5
+TT_ID = 6
+TT_EOF = 7
+TT_DOTNAME = 8
+
+# Plain slotted classes rather than NamedTuples: slots skip both the
+# per-instance __dict__ and tuple.__new__'s generic construction path.
+# Only tokens that survive into the parsed FunctionSignature are
+# materialized as Token objects.
+@dataclass(slots=True)
+class Token:
+    type: int
     value: str
 
-class Argument(NamedTuple):
+@dataclass(slots=True)
+class Argument:
     name: str  # may be '' for special construct like *args
-    type: list[Token]
-    default: list[Token]
-    prefix: list[Token]
+    type: tuple[Token, ...]
+    default: tuple[Token, ...]
+    prefix: tuple[Token, ...]
 
-class FunctionSignature(NamedTuple):
+@dataclass(slots=True)
+class FunctionSignature:
     name: str
-    args: list[Argument]
-    ret: list[Token]
-    ret_prefix: list[Token]
-
-def parse_function_signature(sig: str) -> FunctionSignature:
-    # Tokenize
-    tokens: list[Token] = []
-    paren_stack: list[str] = []
-    i = 0
-    while i < len(sig):
-        if sig[i].isspace():
-            i += 1
-        elif sig[i:i+3] == '...':
-            tokens.append(Token('op', '...'))
-            i += 3
-        elif sig[i:i+2] in TWOCHAR_OPS:
-            tokens.append(Token('op', sig[i:i+2]))
-            i += 2
-        elif sig[i] in OPS:
-            tokens.append(Token('op', sig[i]))
-            i += 1
-        elif sig[i] in BRACKETS:
-            tokens.append(Token('lparen', sig[i]))
-            paren_stack.append(BRACKETS[sig[i]])
-            i += 1
-        elif sig[i] in CLOSE_BRACKETS:
-            tokens.append(Token('rparen', sig[i]))
-            if not paren_stack or paren_stack[-1] != sig[i]:
-                raise ValueError('func sig: unmatched %s' % sig[i])
-            paren_stack.pop()
-            i += 1
-        elif sig[i] in DECDIGITS:
-            j = i + 1
-            if (sig[i] == '0' and i + 1 < len(sig)
-                    and (b := sig[i + 1].upper()) in BASES):
-                j += 2
-                base10 = False
-                digits = HEXDIGITS[:BASES[b]]
+    args: tuple[Argument, ...]
+    ret: tuple[Token, ...]
+    ret_prefix: tuple[Token, ...]
+
+def _parse_expression(
+    sig: str, types: bytearray, starts: "array[int]", ends: "array[int]",
+    i: int, res: list[Token],
+) -> int:
+    """Parse an expression starting at token `i`, appending to `res`.
+
+    Works on the structure-of-arrays token stream; only tokens that
+    make it into `res` allocate. Returns the index of the first token
+    after the expression. The stream must end with the EOF sentinel.
+    """
+    tt = types[i]
+    nparens = 0
+    while True:
+        if tt == TT_OP:
+            value = sig[starts[i]:ends[i]]
+            if value in EXPRESSION_OPS or (value == ',' and nparens):
+                res.append(Token(TT_OP, value))
             else:
-                base10 = True
-                digits = DECDIGITS
-            while j < len(sig) and sig[j].lower() in digits:
-                j += 1
-            if base10 and j < len(sig) and sig[j] == '.':
-                j += 1
-                while j < len(sig) and sig[j] in DECDIGITS:
-                    j += 1
-            tokens.append(Token('number', sig[i:j]))
-            i = j
-        elif sig[i] == '"':
-            j = i + 1
-            while j < len(sig) and sig[j] != '"':
-                if sig[j] == '\\':
-                    j += 1
-                j += 1
-            if j >= len(sig):
-                raise ValueError('func sig: unclosed string at char %d' % i)
-            j += 1
-            tokens.append(Token('string', sig[i:j]))
-            i = j
-        elif sig[i].isalpha() or sig[i] == '_':
-            j = i + 1
-            while (
-                j < len(sig)
-                and (sig[j].isalpha() or sig[j] in DECDIGITS or sig[j] == '_')
-            ):
-                j += 1
-            word = sig[i:j]
-            if word in ('const', 'None', 'False', 'True'):
-                tokens.append(Token('keyword', word))
-            else:
-                tokens.append(Token('id', word))
-            i = j
+                break
+        elif tt == TT_NUMBER or tt == TT_STRING or tt == TT_KEYWORD:
+            res.append(Token(tt, sig[starts[i]:ends[i]]))
+        elif tt == TT_ID:
+            words = [sig[starts[i]:ends[i]]]
+            i += 1
+            tt = types[i]
+            while tt == TT_OP and sig[starts[i]:ends[i]] == '.':
+                i += 1
+                tt = types[i]
+                if tt != TT_ID:
+                    raise ValueError('func sig: expect id after .')
+                words.append(sig[starts[i]:ends[i]])
+                i += 1
+                tt = types[i]
+            res.append(Token(TT_DOTNAME, '.'.join(words)))
+            continue
+        elif tt == TT_LPAREN:
+            nparens += 1
+            res.append(Token(TT_LPAREN, sig[starts[i]]))
+        elif tt == TT_RPAREN:
+            if not nparens:
+                break
+            nparens -= 1
+            res.append(Token(TT_RPAREN, sig[starts[i]]))
         else:
-            raise ValueError('func sig: invalid syntax at char %d' % i)
-    if paren_stack:
-        raise ValueError('func sig: unclosed paren(s): %s' % paren_stack)
-    # Parse
-    if len(tokens) < 3:
-        raise ValueError('func sig: less than 3 tokens')
+            break
+        i += 1
+        tt = types[i]
+    return i
+
+def parse_function_signature(sig: str) -> FunctionSignature:
+    """Parse a function signature, memoizing by the signature string.
+
+    The parser is deterministic, so identical signatures (e.g. across
+    incremental rebuilds) cost one hash lookup. Callers must treat the
+    returned object as immutable since it is shared by the cache.
+    """
+    return _parse_function_signature_cached(sig)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_function_signature_cached(sig: str) -> FunctionSignature:
+    # Tokenize. Each token is a type-code byte plus start/end offsets
+    # into `sig`; values are sliced out lazily, so purely structural
+    # tokens (parens, commas, markers) never allocate. The stream
+    # storage is preallocated at its worst case (one token per
+    # character, plus the sentinel) and written through an index, so it
+    # never reallocates; slots past the sentinel are simply never read.
+    n = len(sig)
+    cap = n + 1
+    types = bytearray(cap)
+    starts = array('i', [0]) * cap
+    ends = array('i', [0]) * cap
+    paren_stack: list[str] = [''] * n
+    ntok = 0
+    depth = 0
     i = 0
-    tok: Token = tokens[0]
-    def forward(n: int = 1):
-        nonlocal i, tok
-        i += n
-        if i < len(tokens):
-            tok = tokens[i]
+    while i < n:
+        ch = sig[i]
+        code = ord(ch)
+        if code < 256:
+            cls = CHAR_CLASS[code]
+        elif ch.isalpha():
+            cls = CC_NAME
+        elif ch.isspace():
+            cls = CC_SPACE
         else:
-            tok = Token('eof', '')
-    def parse_expression(res: list[Token]):
-        nparens = 0
-        while True:
-            if (
-                (
-                    tok.type == 'op'
-                    and (
-                        tok.value in EXPRESSION_OPS
-                        or (tok.value == ',' and nparens)
+            cls = CC_OTHER
+        match cls:
+            case 1:  # CC_SPACE
+                i += 1
+            case 4:  # CC_OP
+                # Decide the operator length by direct indexing on the
+                # following characters; no slice objects on this path.
+                if (ch == '.' and i + 2 < n
+                        and sig[i + 1] == '.' and sig[i + 2] == '.'):
+                    oplen = 3
+                elif i + 1 < n and (
+                    (c2 := sig[i + 1]) == '=' and ch in '<>=!'
+                    or ch == '-' and c2 == '>'
+                    or ch == '*' and c2 == '*'
+                ):
+                    oplen = 2
+                elif ch in OPS:
+                    oplen = 1
+                else:
+                    raise ValueError(
+                        'func sig: invalid syntax at char %d' % i
                     )
-                )
-                or tok.type in ('number', 'string', 'keyword')
-            ):
-                pass
-            elif tok.type == 'id':
-                words = [tok.value]
-                forward()
-                while tok.type == 'op' and tok.value == '.':
-                    forward()
-                    if tok.type != 'id':
-                        raise ValueError('func sig: expect id after .')
-                    words.append(tok.value)
-                    forward()
-                res.append(Token('dotname', '.'.join(words)))
-                continue
-            elif tok.type == 'lparen':
-                nparens += 1
-            elif tok.type == 'rparen':
-                if nparens:
-                    nparens -= 1
+                types[ntok] = TT_OP
+                starts[ntok] = i
+                ends[ntok] = i + oplen
+                ntok += 1
+                i += oplen
+            case 5:  # CC_LPAREN
+                types[ntok] = TT_LPAREN
+                starts[ntok] = i
+                ends[ntok] = i + 1
+                ntok += 1
+                paren_stack[depth] = BRACKETS[ch]
+                depth += 1
+                i += 1
+            case 6:  # CC_RPAREN
+                types[ntok] = TT_RPAREN
+                starts[ntok] = i
+                ends[ntok] = i + 1
+                ntok += 1
+                if not depth or paren_stack[depth - 1] != ch:
+                    raise ValueError('func sig: unmatched %s' % ch)
+                depth -= 1
+                i += 1
+            case 2:  # CC_DIGIT
+                j = _scan_number(sig, i)
+                types[ntok] = TT_NUMBER
+                starts[ntok] = i
+                ends[ntok] = j
+                ntok += 1
+                i = j
+            case 7:  # CC_QUOTE
+                j = i + 1
+                while j < n and sig[j] != '"':
+                    if sig[j] == '\\':
+                        j += 1
+                    j += 1
+                if j >= n:
+                    raise ValueError(
+                        'func sig: unclosed string at char %d' % i
+                    )
+                j += 1
+                types[ntok] = TT_STRING
+                starts[ntok] = i
+                ends[ntok] = j
+                ntok += 1
+                i = j
+            case 3:  # CC_NAME
+                # One C-level scan takes the ASCII run; the table loop
+                # only continues across rare non-ASCII letters.
+                j = _RE_IDENT_BODY.match(sig, i + 1).end()
+                while j < n:
+                    c = ord(sig[j])
+                    if c < 256:
+                        if not IDENT_CONT[c]:
+                            break
+                    elif not sig[j].isalpha():
+                        break
+                    j += 1
+                if sig[i:j] in ('const', 'None', 'False', 'True'):
+                    types[ntok] = TT_KEYWORD
                 else:
-                    break
-            else:
-                break
-            res.append(tok)
-            forward()
+                    types[ntok] = TT_ID
+                starts[ntok] = i
+                ends[ntok] = j
+                ntok += 1
+                i = j
+            case _:
+                raise ValueError('func sig: invalid syntax at char %d' % i)
+    if depth:
+        raise ValueError(
+            'func sig: unclosed paren(s): %s' % paren_stack[:depth]
+        )
+    # Parse. `i`/`tt` are threaded as plain locals (LOAD_FAST) rather
+    # than through closure cells. Advancing never runs while `tt` is
+    # already the sentinel, so `types[i + 1]` is always in range.
+    ntokens = ntok
+    if ntokens < 3:
+        raise ValueError('func sig: less than 3 tokens')
+    types[ntok] = TT_EOF
+    starts[ntok] = n
+    ends[ntok] = n
     args: list[Argument] = []
-    if tok.type != 'id':
+    if types[0] != TT_ID:
         raise ValueError('func sig: first token must be an id')
-    func_name = tok.value
-    forward()
-    if tok.type != 'lparen' or tok.value != '(':
+    func_name = sig[starts[0]:ends[0]]
+    if types[1] != TT_LPAREN or sig[starts[1]] != '(':
         raise ValueError('func sig: second token must be left paren')
-    forward()
-    if tok.type == 'rparen' and tok.value == ')':
-        forward()
+    i = 2
+    tt = types[2]
+    if tt == TT_RPAREN and sig[starts[2]] == ')':
+        i = 3
+        tt = types[3]
     else:
-        while i < len(tokens):
+        while i < ntokens:
             # Main body
-            if tok.type == 'op' and tok.value == '/':
+            if tt == TT_OP and sig[starts[i]:ends[i]] == '/':
                 # Position only marker
-                forward()
-                args.append(Argument('', [], [], []))
+                i += 1
+                tt = types[i]
+                args.append(Argument('', (), (), ()))
             else:
                 t_type = []
                 t_default = []
                 t_prefix = []
+                v = sig[starts[i]:ends[i]]
                 # Read 'const' or '&'
-                if (tok.type == 'keyword' and tok.value == 'const'
-                        or tok.type == 'op' and tok.value == '&'):
-                    t_prefix.append(tok)
-                    forward()
+                if (tt == TT_KEYWORD and v == 'const'
+                        or tt == TT_OP and v == '&'):
+                    t_prefix.append(Token(tt, v))
+                    i += 1
+                    tt = types[i]
+                    v = sig[starts[i]:ends[i]]
                 # Read '*', '**'
                 maybe_marker = False
-                if tok.type == 'op' and tok.value in ('*', '**'):
-                    maybe_marker = (tok.value == '*' and not t_prefix)
-                    t_prefix.append(tok)
-                    forward()
+                if tt == TT_OP and v in ('*', '**'):
+                    maybe_marker = (v == '*' and not t_prefix)
+                    t_prefix.append(Token(TT_OP, v))
+                    i += 1
+                    tt = types[i]
+                    v = sig[starts[i]:ends[i]]
                 # Read argument name
-                if tok.type == 'id':
-                    t_name = tok.value
-                    forward()
-                    if tok.type == 'op' and tok.value == ':':
-                        forward()
-                        parse_expression(t_type)
-                    if tok.type == 'op' and tok.value == '=':
-                        forward()
-                        parse_expression(t_default)
+                if tt == TT_ID:
+                    t_name = v
+                    i += 1
+                    tt = types[i]
+                    if tt == TT_OP and sig[starts[i]:ends[i]] == ':':
+                        i = _parse_expression(sig, types, starts, ends,
+                                              i + 1, t_type)
+                        tt = types[i]
+                    if tt == TT_OP and sig[starts[i]:ends[i]] == '=':
+                        i = _parse_expression(sig, types, starts, ends,
+                                              i + 1, t_default)
+                        tt = types[i]
                 elif maybe_marker:
                     t_name = ''
                 else:
                     raise ValueError(
                         'func sig: expect argument name at token %d' % i
                     )
-                args.append(Argument(t_name, t_type, t_default, t_prefix))
+                args.append(Argument(
+                    t_name, tuple(t_type), tuple(t_default), tuple(t_prefix)
+                ))
             # Comma (or rparen)
-            if tok.type != 'op' or tok.value != ',':
+            if tt != TT_OP or sig[starts[i]:ends[i]] != ',':
                 break
-            forward()
+            i += 1
+            tt = types[i]
         # Rparen
-        if tok.type != 'rparen' or tok.value != ')':
+        if tt != TT_RPAREN or sig[starts[i]] != ')':
             raise ValueError('func sig: expect rparen at token %d' % i)
-        forward()
+        i += 1
+        tt = types[i]
     # Return value
     returns = []
     ret_prefix = []
-    if tok.type != 'eof':
-        if tok.type != 'op' or tok.value != '->':
+    if tt != TT_EOF:
+        if tt != TT_OP or sig[starts[i]:ends[i]] != '->':
             raise ValueError('func sig: expect -> at token %d' % i)
-        forward()
-        if (tok.type == 'keyword' and tok.value == 'const'
-                or tok.type == 'op' and tok.value == '&'):
-            ret_prefix.append(tok)
-            forward()
-        parse_expression(returns)
-    return FunctionSignature(func_name, args, returns, ret_prefix)
+        i += 1
+        tt = types[i]
+        v = sig[starts[i]:ends[i]]
+        if (tt == TT_KEYWORD and v == 'const'
+                or tt == TT_OP and v == '&'):
+            ret_prefix.append(Token(tt, v))
+            i += 1
+        _parse_expression(sig, types, starts, ends, i, returns)
+    return FunctionSignature(
+        func_name, tuple(args), tuple(returns), tuple(ret_prefix)
+    )
+
+# Node constructor per token type code; None marks types that must
+# never reach the renderer.
+_NODE_CTORS = (
+    addnodes.desc_sig_operator,        # TT_OP
+    addnodes.desc_sig_punctuation,     # TT_LPAREN
+    addnodes.desc_sig_punctuation,     # TT_RPAREN
+    addnodes.desc_sig_literal_number,  # TT_NUMBER
+    addnodes.desc_sig_literal_string,  # TT_STRING
+    addnodes.desc_sig_keyword,         # TT_KEYWORD
+    None,                              # TT_ID
+    None,                              # TT_EOF
+    addnodes.desc_sig_name,            # TT_DOTNAME
+)
 
 def token_to_node(token: Token) -> nodes.Node:
-    v = token.value
-    match token.type:
-        case 'op':
-            return addnodes.desc_sig_operator('', v)
-        case 'lparen' | 'rparen':
-            return addnodes.desc_sig_punctuation('', v)
-        case 'number':
-            return addnodes.desc_sig_literal_number('', v)
-        case 'string':
-            return addnodes.desc_sig_literal_string('', v)
-        case 'keyword':
-            return addnodes.desc_sig_keyword('', v)
-        case 'dotname':
-            return addnodes.desc_sig_name('', v)
-        case _:
-            raise ValueError('unknown token type: %s' % token.type)
-
-def toklist_to_nodes(lst: list[Token], node: "Element"):
-    for token in lst:
-        node += token_to_node(token)
-
-def prefix_to_nodes(lst: list[Token], node: "Element"):
+    ctor = _NODE_CTORS[token.type]
+    if ctor is None:
+        raise ValueError('unknown token type: %s' % token.type)
+    return ctor('', token.value)
+
+def toklist_to_nodes(lst: tuple[Token, ...]) -> list[nodes.Node]:
+    return [token_to_node(token) for token in lst]
+
+def prefix_to_nodes(lst: tuple[Token, ...]) -> list[nodes.Node]:
+    res: list[nodes.Node] = []
     for pref in lst:
-        node += token_to_node(pref)
-        if pref.type == 'keyword':
-            node += addnodes.desc_sig_space()
+        res.append(token_to_node(pref))
+        if pref.type == TT_KEYWORD:
+            res.append(addnodes.desc_sig_space())
+    return res
 
 def signature_to_nodes(sig: FunctionSignature, node: "Element"):
-    node += addnodes.desc_name(sig.name, sig.name)
+    # Build each subtree as a plain list first and attach it with one
+    # `extend` call, instead of going through docutils' `+=`
+    # child-by-child.
+    children: list[nodes.Node] = [addnodes.desc_name(sig.name, sig.name)]
     # Parameters
     paramlist = addnodes.desc_parameterlist()
-    node += paramlist
+    children.append(paramlist)
+    params: list[nodes.Node] = []
     for arg in sig.args:
-        param = addnodes.desc_parameter()
-        paramlist += param
-        prefix_to_nodes(arg.prefix, param)
+        sub = prefix_to_nodes(arg.prefix)
         if arg.name:
-            param += addnodes.desc_sig_name(arg.name, arg.name)
+            sub.append(addnodes.desc_sig_name(arg.name, arg.name))
         if arg.type:
-            param += addnodes.desc_sig_operator(':', ':')
-            param += addnodes.desc_sig_space()
-            toklist_to_nodes(arg.type, param)
+            sub.append(addnodes.desc_sig_operator(':', ':'))
+            sub.append(addnodes.desc_sig_space())
+            sub.extend(toklist_to_nodes(arg.type))
         if arg.default:
-            param += addnodes.desc_sig_space()
-            param += addnodes.desc_sig_operator('=', '=')
-            param += addnodes.desc_sig_space()
-            toklist_to_nodes(arg.default, param)
+            sub.append(addnodes.desc_sig_space())
+            sub.append(addnodes.desc_sig_operator('=', '='))
+            sub.append(addnodes.desc_sig_space())
+            sub.extend(toklist_to_nodes(arg.default))
+        param = addnodes.desc_parameter()
+        param.extend(sub)
+        params.append(param)
+    paramlist.extend(params)
     # Return
     if sig.ret:
-        node += addnodes.desc_returns()
-        prefix_to_nodes(sig.ret_prefix, node)
-        toklist_to_nodes(sig.ret, node)
+        children.append(addnodes.desc_returns())
+        children.extend(prefix_to_nodes(sig.ret_prefix))
+        children.extend(toklist_to_nodes(sig.ret))
+    node.extend(children)
 
 class AcaciaFunction(BaseAcaciaObject[FunctionSignature]):
     option_spec: "OptionSpec" = BaseAcaciaObject.option_spec.copy()
@@ -458,7 +685,6 @@ class AcaciaFunction(BaseAcaciaObject[FunctionSignature]):
         except ValueError as e:
             logger.error(e.args[0], location=signode)
             raise
-        logger.info(parsed_sig, location=signode)
         func_type = self.options.get('type')
         prefix = '' if func_type is None else func_type + ' '
         signode += addnodes.desc_annotation('', prefix + 'def')
@@ -472,11 +698,20 @@ class AcaciaFunction(BaseAcaciaObject[FunctionSignature]):
     def before_content(self) -> None:
         super().before_content()
         sig = self.names[0]
-        st = self.env.ref_context.setdefault('aca:param_stack', [])
-        st.append([arg.name for arg in sig.args if arg.name])
+        ctx = _get_ctx(self.env)
+        names = frozenset(arg.name for arg in sig.args if arg.name)
+        ctx.param_stack.append(names)
+        ctx.param_union.update(names)
 
     def after_content(self) -> None:
-        self.env.ref_context['aca:param_stack'].pop()
+        ctx = _get_ctx(self.env)
+        names = ctx.param_stack.pop()
+        union = ctx.param_union
+        union.subtract(names)
+        for name in names:
+            if not union[name]:
+                # `in union` must keep meaning "in some open scope"
+                del union[name]
         super().after_content()
 
 class AcaciaModule(AcaciaObject):
@@ -526,8 +761,7 @@ class AcaciaAttribute(AcaciaObject):
     attribute_owning = AttrOwning.NO_ATTR
 
     def full_name_from_partial(self, partial_name: str) -> str:
-        attr_owner: AttrOwner | None = \
-            self.env.ref_context.get('aca:attr_owner')
+        attr_owner = _get_ctx(self.env).attr_owner
         if attr_owner is None:
             # We've logged this when handling signature
             return '<error attribute>'
@@ -540,8 +774,7 @@ class AcaciaAttribute(AcaciaObject):
         return _('%s (attribute)') % fullname
 
     def my_handle_signature(self, sig: str, signode: "desc_signature") -> str:
-        attr_owner: AttrOwner | None = \
-            self.env.ref_context.get('aca:attr_owner')
+        attr_owner = _get_ctx(self.env).attr_owner
         partial_name = sig.strip()
         if attr_owner is None:
             logger.error(
@@ -586,7 +819,7 @@ class AcaciaXRefRole(XRefRole):
         has_explicit_title: bool, title: str, target: str,
         suffix: str = ''
     ) -> tuple[str, str]:
-        refnode['aca:module_attr'] = env.ref_context.get('aca:module')
+        refnode[_K_MODULE_ATTR] = _get_ctx(env).module
         if has_explicit_title:
             return title, target
         if title.startswith('~'):
@@ -613,8 +846,8 @@ class AcaciaFunctionRole(AcaciaXRefRole):
 
 class AcaciaParamRole(SphinxRole):
     def run(self) -> tuple[list["Node"], list["system_message"]]:
-        st = self.env.ref_context.get('aca:param_stack', [])
-        if not any(self.text in args for args in st):
+        union = _get_ctx(self.env).param_union
+        if self.text not in union:
             logger.warning('Unknown Acacia parameter %r' % self.text,
                            location=self.get_location())
         literal = nodes.literal(self.text, self.text)
@@ -625,8 +858,8 @@ class AcaciaAttributeRole(AcaciaXRefRole):
         self, env: "BuildEnvironment", refnode: "Element",
         has_explicit_title: bool, title: str, target: str
     ) -> tuple[str, str]:
-        attr_owner: AttrOwner | None = env.ref_context.get('aca:attr_owner')
-        refnode['aca:attr_owner_fullname'] = \
+        attr_owner = _get_ctx(env).attr_owner
+        refnode[_K_ATTR_OWNER_FULLNAME] = \
             None if attr_owner is None else attr_owner.fullname
         return super().process_link(
             env, refnode, has_explicit_title, title, target,
@@ -658,37 +891,90 @@ class AcaciaDomain(Domain):
         'attr': AcaciaAttributeRole(),
         'type': AcaciaTypeRole(),
     }
+    # Lazy cache for objtypes_for_role; class-level is fine because
+    # object_types is class-level too.
+    _role_objtypes: dict[str, list[str]] = {}
     initial_data = {
+        # objtype -> name -> (docname, node_id)
         'objects': {},
+        # docname -> {(objtype, name)}; inverted index so that
+        # clear_doc/merge_domaindata only touch that doc's objects
+        'by_doc': {},
     }
 
     @property
-    def objects(self) -> dict[tuple[str, str], tuple[str, str]]:
+    def objects(self) -> dict[str, dict[str, tuple[str, str]]]:
         return self.data.setdefault('objects', {})
 
+    @property
+    def by_doc(self) -> dict[str, set[tuple[str, str]]]:
+        return self.data.setdefault('by_doc', {})
+
     def note_object(
         self, objtype: str, name: str, node_id: str, location=None
     ) -> None:
-        if (objtype, name) in self.objects:
-            docname, node_id = self.objects[objtype, name]
+        by_type = self.objects.setdefault(objtype, {})
+        entry = by_type.get(name)
+        if entry is not None:
+            docname, node_id = entry
             logger.warning(
                 'duplicate description of %s %s, other instance in %s'
                 % (objtype, name, docname), location=location
             )
+            docs = self.by_doc.get(docname)
+            if docs is not None:
+                docs.discard((objtype, name))
 
-        self.objects[objtype, name] = (self.env.docname, node_id)
+        by_type[name] = (self.env.docname, node_id)
+        self.by_doc.setdefault(self.env.docname, set()).add((objtype, name))
 
     def clear_doc(self, docname: str) -> None:
-        for (typ, name), (doc, _node_id) in list(self.objects.items()):
-            if doc == docname:
-                del self.objects[typ, name]
+        objects = self.objects
+        for objtype, name in self.by_doc.pop(docname, ()):
+            objects[objtype].pop(name, None)
 
     def merge_domaindata(
         self, docnames: list[str], otherdata: dict[str, Any]
     ) -> None:
-        for (typ, name), (doc, node_id) in otherdata['objects'].items():
-            if doc in docnames:
-                self.objects[typ, name] = (doc, node_id)
+        other_objects = otherdata['objects']
+        for doc in docnames:
+            entries = otherdata['by_doc'].get(doc)
+            if not entries:
+                continue
+            self.by_doc.setdefault(doc, set()).update(entries)
+            for typ, name in entries:
+                self.objects.setdefault(typ, {})[name] = \
+                    other_objects[typ][name]
+
+    def _candidate_targets(
+        self, node: "pending_xref", typ: str, target: str,
+        already_fullname: bool,
+    ) -> Iterator[str]:
+        """Yield the full names `target` may refer to, best first.
+
+        Lazy and deduplicated: callers that hit on the first candidate
+        never pay for building the rest, and a candidate equal to an
+        earlier one (e.g. when the module prefix is empty) is skipped.
+        """
+        seen = set()
+        if not already_fullname:
+            if typ in ('attr',) and (aon := node[_K_ATTR_OWNER_FULLNAME]):
+                # Can refer to other attributes under the same attribute
+                # owner
+                seen.add(aon + "::" + target)
+                yield aon + "::" + target
+                seen.add(aon + "." + target)
+                yield aon + "." + target
+            if (modname := node[_K_MODULE_ATTR]) is not None:
+                # Can refer to other objects in the same module
+                fullname = f'{modname}.{target}' if modname else target
+                if fullname not in seen:
+                    seen.add(fullname)
+                    yield fullname
+        # Can search from toplevel (treat it as a full name) (least
+        # priority)
+        if target not in seen:
+            yield target
 
     def resolve_xref(
         self, env: "BuildEnvironment", fromdocname: str, builder: "Builder",
@@ -697,26 +983,22 @@ class AcaciaDomain(Domain):
         # Check prefixing '^' that indicates "full name already given"
         if already_fullname := target.startswith('^'):
             target = target[1:]
-        # Decide where to search for the given name
-        possible_targets = []
-        if not already_fullname:
-            if typ in ('attr',) and (aon := node['aca:attr_owner_fullname']):
-                # Can refer to other attributes under the same attribute
-                # owner
-                possible_targets.append(aon + "::" + target)
-                possible_targets.append(aon + "." + target)
-            if (modname := node['aca:module_attr']) is not None:
-                # Can refer to other objects in the same module
-                possible_targets.append(get_fullname(target, modname))
-        # Can search from toplevel (treat it as a full name) (least
-        # priority)
-        possible_targets.append(target)
-        # Start checking if the targets are valid
-        for full_target in possible_targets:
+        # `objtypes_for_role` only depends on `typ`, so resolve it once
+        # per role type and reuse it across all candidates.
+        objtypes = self._role_objtypes.get(typ)
+        if objtypes is None:
             objtypes = self.objtypes_for_role(typ)
             assert objtypes is not None
+            self._role_objtypes[typ] = objtypes
+        # Start checking if the targets are valid
+        for full_target in self._candidate_targets(
+            node, typ, target, already_fullname,
+        ):
             for objtype in objtypes:
-                result = self.objects.get((objtype, full_target))
+                by_type = self.objects.get(objtype)
+                if by_type is None:
+                    continue
+                result = by_type.get(full_target)
                 if result is None:
                     continue
                 todocname, node_id = result
@@ -727,8 +1009,9 @@ class AcaciaDomain(Domain):
         return None
 
     def get_objects(self) -> Iterator[tuple[str, str, str, str, str, int]]:
-        for (typ, name), (docname, node_id) in self.data['objects'].items():
-            yield name, name, typ, docname, node_id, 1
+        for typ, by_type in self.data['objects'].items():
+            for name, (docname, node_id) in by_type.items():
+                yield name, name, typ, docname, node_id, 1
 
 def setup(app: "Sphinx"):
     app.add_domain(AcaciaDomain)
@@ -739,7 +1022,9 @@ def setup(app: "Sphinx"):
 
     return {
         'version': '0.1',
-        'env_version': 1,
+        # 2: domain data keyed by objtype instead of (objtype, name)
+        # 3: added the by_doc inverted index
+        'env_version': 3,
         'parallel_read_safe': True,
         'parallel_write_safe': True,
     }
@@ -1,15 +1,95 @@
 """Lexer for Acacia."""
 
-__all__ = ["AcaciaLexer"]
+__all__ = ["AcaciaLexer", "CachedAcaciaLexer"]
 
-from pygments.lexer import RegexLexer, include, words, default, bygroups
+from sys import intern
+from pygments.lexer import (
+    RegexLexer, RegexLexerMeta, include, default, bygroups
+)
 from pygments.token import *
 from pygments import unistring as uni
 
 alpha_class = '_' + uni.Lu + uni.Ll + uni.Lm + uni.Lo + uni.Lt
 identifier = r"[%s][%s]*" % (alpha_class, '0-9' + alpha_class)
 
-class AcaciaLexer(RegexLexer):
+# One token type per reserved word. A single identifier match followed
+# by one dict lookup replaces the four words(...) alternations that
+# each re-scanned the same alphabetic run.
+_WORD_TOKENS = {}
+for _w in ("and", "or", "not"):
+    _WORD_TOKENS[_w] = Operator.Word
+for _w in ("True", "False", "None"):
+    _WORD_TOKENS[_w] = Keyword.Constant
+for _w in (
+    # entity, struct, def, interface have their own rules
+    "inline", "extends", "self", "result", "import", "as",
+    "from", "virtual", "override", "new", "const", "static"
+):
+    _WORD_TOKENS[_w] = Keyword
+for _w in ("if", "elif", "else", "while", "pass", "for", "in"):
+    _WORD_TOKENS[_w] = Keyword.ControlFlow
+del _w
+_FONT_NAMES = frozenset((
+    'reset', 'bold', 'italic', 'obfuscated',
+    'black', 'dark_blue', 'dark_green', 'dark_aqua',
+    'dark_red', 'dark_purple', 'gold', 'gray', 'dark_gray',
+    'blue', 'green', 'aqua', 'red', 'light_purple',
+    'yellow', 'white', 'minecoin_gold',
+    'material_quartz', 'material_iron',
+    'material_netherite', 'material_redstone',
+    'material_copper', 'material_gold',
+    'material_emerald', 'material_diamond',
+    'material_lapis', 'material_amethyst'
+))
+_BUILTINS = frozenset((
+    # Types
+    "int", "bool", "Pos", "Rot", "Offset", "Engroup",
+    "Enfilter", "list", "map", "AbsPos", "ExternEngroup",
+    "Entity", "Any",
+    # Functions
+    "scb", "swap", "upcast"
+))
+
+def _classify_name(lexer, match):
+    r"""Emit the right token for an identifier-shaped match.
+
+    Builtin names keep the behavior of the old ``(?<!\.)`` prefix:
+    right after a ``.`` they are plain names.
+    """
+    value = match.group()
+    token = _WORD_TOKENS.get(value)
+    if token is None:
+        start = match.start()
+        if (value in _BUILTINS
+                and (start == 0 or match.string[start - 1] != '.')):
+            token = Name.Builtin
+        else:
+            token = Name
+    yield match.start(), token, value
+
+def _classify_font(lexer, match):
+    """Classify a word inside ``\\#(...)`` by font-name membership."""
+    value = match.group()
+    token = Name.Builtin.Pseudo if value in _FONT_NAMES else Name
+    yield match.start(), token, value
+
+# Several rules reuse the same pattern (`identifier` appears in root,
+# func_name and class_name, and include("ws") copies its rules into
+# every state that pulls it in). Compiling each distinct (pattern,
+# flags) pair once and sharing the matcher trims table-build time and
+# Pattern-object footprint.
+_matcher_cache: dict = {}
+
+class AcaciaLexerMeta(RegexLexerMeta):
+    def _process_regex(cls, rex, rflags, state):
+        key = (rex, rflags)
+        matcher = _matcher_cache.get(key)
+        if matcher is None:
+            matcher = _matcher_cache[key] = \
+                super()._process_regex(rex, rflags, state)
+        return matcher
+
+class AcaciaLexer(RegexLexer, metaclass=AcaciaLexerMeta):
     name = "AcaciaMC"
     aliases = ["acacia", "aca"]
     filenames = ["*.aca"]
@@ -31,14 +111,10 @@ class AcaciaLexer(RegexLexer):
                 r"->|!=|==|\+=|-=|\*=|/=|%=|[-+/*%=<>.|]",
                 Operator,
             ),
-            (words(("and", "or", "not"), suffix=r"\b"), Operator.Word),
-            include("keywords"),
-            include("control_flow_keywords"),
             (r"\bdef\b", Keyword.Declaration, "func_name"),
             (r"\b(entity|struct)\b", Keyword.Declaration, "class_name"),
             (r"\binterface\b", Keyword.Declaration, "interface_name"),
-            include("builtins"),
-            (identifier, Name),
+            (identifier, _classify_name),
         ],
         "ws": [
             # We split `\s+` into two rules, so that the rule that
@@ -57,47 +133,6 @@ class AcaciaLexer(RegexLexer):
             (r"[+-]?\d+\.\d+", Number.Float),
             (r"[+-]?\d+", Number.Integer),
         ],
-        "control_flow_keywords": [
-            (
-                words(
-                    ("if", "elif", "else", "while", "pass", "for", "in"),
-                    suffix=r"\b"
-                ),
-                Keyword.ControlFlow
-            )
-        ],
-        "keywords": [
-            (words(("True", "False", "None"), suffix=r"\b"), Keyword.Constant),
-            (
-                words(
-                    (
-                        # entity, struct, def, interface have their own rules
-                        "inline", "extends", "self", "result", "import", "as",
-                        "from", "virtual", "override", "new", "const",
-                        "virtual", "static"
-                    ),
-                    suffix=r"\b"
-                ),
-                Keyword
-            )
-        ],
-        "builtins": [
-            (
-                words(
-                    (
-                        # Types
-                        "int", "bool", "Pos", "Rot", "Offset", "Engroup",
-                        "Enfilter", "list", "map", "AbsPos", "ExternEngroup",
-                        "Entity", "Any",
-                        # Functions
-                        "scb", "swap", "upcast"
-                    ),
-                    prefix=r"(?<!\.)",
-                    suffix=r"\b"
-                ),
-                Name.Builtin
-            )
-        ],
         "func_name": [
             include("ws"),
             (identifier, Name.Function, "#pop"),
@@ -158,24 +193,55 @@ class AcaciaLexer(RegexLexer):
             (r"\)", String.Escape, "#pop"),
             (r",", Punctuation),
             (r"\s+", Whitespace),
-            (
-                words(
-                    (
-                        'reset', 'bold', 'italic', 'obfuscated',
-                        'black', 'dark_blue', 'dark_green', 'dark_aqua',
-                        'dark_red', 'dark_purple', 'gold', 'gray', 'dark_gray',
-                        'blue', 'green', 'aqua', 'red', 'light_purple',
-                        'yellow', 'white', 'minecoin_gold',
-                        'material_quartz', 'material_iron',
-                        'material_netherite', 'material_redstone',
-                        'material_copper', 'material_gold',
-                        'material_emerald', 'material_diamond',
-                        'material_lapis', 'material_amethyst'
-                    ),
-                    suffix=r"\b"
-                ),
-                Name.Builtin.Pseudo
-            ),
-            (r"\w+", Name)
+            (r"\w+", _classify_font)
         ]
     }
+
+class CachedAcaciaLexer(AcaciaLexer):
+    """`AcaciaLexer` that memoizes token streams per source text.
+
+    Short ``.aca`` snippets repeat across pages and incremental builds
+    re-highlight unchanged documents, so replaying a stored stream is
+    often possible. The cache is unbounded but keyed by the literal
+    block text, which the build holds in memory anyway.
+    """
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._cache: dict[str, tuple] = {}
+
+    def get_tokens_unprocessed(self, text, stack=("root",)):
+        if stack != ("root",):
+            yield from super().get_tokens_unprocessed(text, stack)
+            return
+        cached = self._cache.get(text)
+        if cached is None:
+            # Intern short word-like values while building the cached
+            # stream: keywords, builtins and identifiers recur across
+            # blocks, so one shared str serves every occurrence and
+            # downstream dict lookups compare by identity. Paid once
+            # per distinct block, never on replay.
+            cached = tuple(
+                (index, token,
+                 intern(value)
+                 if len(value) <= 16 and value.isidentifier()
+                 else value)
+                for index, token, value
+                in super().get_tokens_unprocessed(text)
+            )
+            self._cache[text] = cached
+        yield from cached
+
+# Compile the token table now instead of at the first instantiation
+# (Pygments' default), so importing this module is all it takes to get
+# a ready lexer and forked parallel build workers share one compiled
+# table via copy-on-write.
+AcaciaLexer._all_tokens = {}
+AcaciaLexer._tmpname = 0
+AcaciaLexer._tokens = AcaciaLexer.process_tokendef(
+    '', AcaciaLexer.get_tokendefs()
+)
+# The metaclass only trusts a table found in the class's own __dict__,
+# so give the subclass its own reference to keep instantiation from
+# recompiling the same rules.
+CachedAcaciaLexer._tokens = AcaciaLexer._tokens
@@ -6,7 +6,7 @@ sys.path.append(os.path.abspath('.'))
 sys.path.append(os.path.abspath("_extensions"))
 
 from sphinx.highlighting import lexers
-from acacia_lexer import AcaciaLexer
+from acacia_lexer import CachedAcaciaLexer
 
 # -- Project information
 
@@ -24,7 +24,7 @@ language = "zh_CN"
 extensions = ["acacia_ext", "acacia_theme"]
 exclude_patterns = ['_extensions/**']
 
-lexers["acacia"] = AcaciaLexer()
+lexers["acacia"] = CachedAcaciaLexer()
 highlight_language = "acacia"
 
 primary_domain = 'aca'